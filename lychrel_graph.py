@@ -1,91 +1,178 @@
+import functools
+import multiprocessing as mp
+import sys
+
+import matplotlib
+matplotlib.use("Agg")  # Plots are only ever written to file, so skip GUI backend setup
 import matplotlib.pyplot as plt
+import numpy as np
 
-def reverse_int(num: int) -> int:
-    """
-    Returns the reverse of the integer 'num' using integer operations.
-    """
-    rev = 0
-    while num > 0:
-        rev = rev * 10 + (num % 10)
-        num //= 10
-    return rev
+try:
+    from gmpy2 import mpz
+except ImportError:  # gmpy2 is optional; plain Python ints do the same job, just slower
+    mpz = int
 
-def is_palindrome(num: int) -> bool:
-    """
-    Checks if 'num' is a palindrome by comparing with its reverse (integer-based).
-    """
-    if num < 0:
-        return False
-    original = num
-    rev = 0
-    while num > 0:
-        rev = rev * 10 + (num % 10)
-        num //= 10
-    return rev == original
-
-def palindrome_iterations(n: int, max_iter: int = 500) -> int:
+# All 249 Lychrel candidates up to 10,000 (OEIS A023108): the families of the
+# seeds 196, 879, 1997, 7059 and 9999. None of them has ever been seen to reach a
+# palindrome, even in searches far longer than any practical max_iter, so
+# 'palindrome_iterations' can answer them without iterating.
+KNOWN_LYCHREL = frozenset([
+    196, 295, 394, 493, 592, 689, 691, 788, 790, 879, 887, 978, 986, 1495, 1497,
+    1585, 1587, 1675, 1677, 1765, 1767, 1855, 1857, 1945, 1947, 1997, 2494,
+    2496, 2584, 2586, 2674, 2676, 2764, 2766, 2854, 2856, 2944, 2946, 2996,
+    3493, 3495, 3583, 3585, 3673, 3675, 3763, 3765, 3853, 3855, 3943, 3945,
+    3995, 4079, 4169, 4259, 4349, 4439, 4492, 4494, 4529, 4582, 4584, 4619,
+    4672, 4674, 4709, 4762, 4764, 4799, 4852, 4854, 4889, 4942, 4944, 4979,
+    4994, 5078, 5168, 5258, 5348, 5438, 5491, 5493, 5528, 5581, 5583, 5618,
+    5671, 5673, 5708, 5761, 5763, 5798, 5851, 5853, 5888, 5941, 5943, 5978,
+    5993, 6077, 6167, 6257, 6347, 6437, 6490, 6492, 6527, 6580, 6582, 6617,
+    6670, 6672, 6707, 6760, 6762, 6797, 6850, 6852, 6887, 6940, 6942, 6977,
+    6992, 7059, 7076, 7149, 7166, 7239, 7256, 7329, 7346, 7419, 7436, 7491,
+    7509, 7526, 7581, 7599, 7616, 7671, 7689, 7706, 7761, 7779, 7796, 7851,
+    7869, 7886, 7941, 7959, 7976, 7991, 8058, 8075, 8079, 8089, 8148, 8165,
+    8169, 8179, 8238, 8255, 8259, 8269, 8328, 8345, 8349, 8359, 8418, 8435,
+    8439, 8449, 8490, 8508, 8525, 8529, 8539, 8580, 8598, 8615, 8619, 8629,
+    8670, 8688, 8705, 8709, 8719, 8760, 8778, 8795, 8799, 8809, 8850, 8868,
+    8885, 8889, 8899, 8940, 8958, 8975, 8979, 8989, 8990, 9057, 9074, 9078,
+    9088, 9147, 9164, 9168, 9178, 9237, 9254, 9258, 9268, 9327, 9344, 9348,
+    9358, 9417, 9434, 9438, 9448, 9507, 9524, 9528, 9538, 9597, 9614, 9618,
+    9628, 9687, 9704, 9708, 9718, 9777, 9794, 9798, 9808, 9867, 9884, 9888,
+    9898, 9957, 9974, 9978, 9988, 9999,
+])
+_KNOWN_LYCHREL_MAX = max(KNOWN_LYCHREL)
+
+# Shared trajectory cache: value -> number of reverse-and-add steps from that value
+# to its first palindrome. A negative entry -k records that no palindrome was found
+# within k steps (a Lychrel candidate for any max_iter <= k).
+_cache: dict[int, int] = {}
+
+def palindrome_iterations(n: int, max_iter: int = 500, skip_known: bool = True) -> int:
     """
     Returns the number of reverse-and-add iterations needed for 'n' to become a palindrome,
     or 'max_iter' if no palindrome is found within that limit.
+
+    Every value visited along the way is recorded in '_cache', so any later chain that
+    merges into an already-explored trajectory returns without recomputing its tail.
+    Chain values use gmpy2's mpz when it is available.
+
+    With 'skip_known', seeds (or chains passing through values) in KNOWN_LYCHREL
+    return 'max_iter' immediately; pass False to actually iterate them. Such
+    short-cuts are never written to '_cache', so a later skip_known=False call
+    still computes the real result.
     """
-    current = n
-    for i in range(1, max_iter + 1):
-        current += reverse_int(current)
-        if is_palindrome(current):
-            return i  # Return the iteration at which a palindrome was found
+    # Negative numbers have no digit reversal; like the original integer-based
+    # version, treat them as never reaching a palindrome
+    if n < 0:
+        return max_iter
+    if skip_known and n in KNOWN_LYCHREL:
+        return max_iter
+    # Single digits need no search: 2n is itself a palindrome for n < 5, and
+    # 10..18 reach 11..99 one step later. Palindromic seeds are not skipped
+    # the same way, since some (e.g. 4994) are Lychrel candidates themselves.
+    if 0 <= n < 10:
+        return min(1 if n < 5 else 2, max_iter)
+    visited = []
+    # GMP arithmetic and base conversion stay fast as chains grow to hundreds of
+    # digits; mpz hashes and compares like int, so '_cache' keys are unaffected
+    current = mpz(n)
+    digits = str(n)
+    for i in range(max_iter):
+        known = _cache.get(current)
+        if known is not None and (known > 0 or i - known >= max_iter):
+            # Back-fill the walked prefix from the cached distance
+            for offset, value in enumerate(visited):
+                _cache[value] = known + i - offset if known > 0 else known - (i - offset)
+            if known > 0 and i + known <= max_iter:
+                return i + known
+            return max_iter
+        if skip_known and current <= _KNOWN_LYCHREL_MAX and current in KNOWN_LYCHREL:
+            return max_iter
+        visited.append(current)
+        # One str() per step: the sum's digits serve both the palindrome test
+        # and the next iteration's reversal. Slicing the string also beats a
+        # 4-digit lookup-table reverse, even for values that fit in 64 bits.
+        current += mpz(digits[::-1])
+        digits = str(current)
+        if digits == digits[::-1]:
+            for offset, value in enumerate(visited):
+                _cache[value] = i + 1 - offset
+            return i + 1  # Return the iteration at which a palindrome was found
+    # No palindrome within max_iter: record how far each value was explored
+    for offset, value in enumerate(visited):
+        if _cache.get(value, 0) > offset - max_iter:
+            _cache[value] = offset - max_iter
     return max_iter  # If no palindrome found by max_iter, return max_iter
 
-def lychrel_graph_save(start: int, end: int, max_iter: int = 500, filename: str = "lychrel_graph.png"):
+def lychrel_graph_save(start: int, end: int, max_iter: int = 500, filename: str = "lychrel_graph.png",
+                       processes: int | None = None, ax=None, verbose: bool = True):
     """
     1. Calculates how many iterations each number in [start, end] takes to reach a palindrome 
        (or max_iter if none found).
     2. Plots the data as a single graph.
     3. Saves the graph to 'filename'.
-    4. Prints each number's iteration count.
+    4. Prints each number's iteration count (only if 'verbose').
     5. Collects and prints the consecutive differences for numbers that did not reach a palindrome.
     6. Closes the plot (does not stay open).
-    """
-    x_vals = []
-    y_vals = []
 
+    The per-number computation is spread over 'processes' worker processes
+    (default: one per CPU); each worker keeps its own trajectory cache.
+
+    If 'ax' is given, the plot is drawn onto that existing Axes and steps 3 and 6
+    are left to the caller, so a batch of runs can share one figure and a single
+    savefig.
+    """
     # We'll store numbers that never hit a palindrome within max_iter
     no_palindrome_nums = []
 
     # 1. Compute iteration counts for each number in the range
-    for n in range(start, end + 1):
-        iters_needed = palindrome_iterations(n, max_iter=max_iter)
-        x_vals.append(n)
-        y_vals.append(iters_needed)
+    x_vals = list(range(start, end + 1))
+    # Seeds with the same first reverse-and-add result share the rest of their
+    # trajectory, so process them back to back (and in the same worker chunk)
+    # to turn all but the first into cache hits (negative seeds have no
+    # trajectory and just sort first)
+    order = sorted(x_vals, key=lambda n: n + int(str(n)[::-1]) if n >= 0 else n)
+    worker = functools.partial(palindrome_iterations, max_iter=max_iter)
+    if processes == 1:
+        results = map(worker, order)
+    else:
+        with mp.Pool(processes) as pool:
+            chunksize = max(1, len(order) // ((processes or mp.cpu_count()) * 4))
+            results = pool.map(worker, order, chunksize=chunksize)
+    iters_of = dict(zip(order, results))
+    y_vals = [iters_of[n] for n in x_vals]
 
+    for n, iters_needed in zip(x_vals, y_vals):
         if iters_needed == max_iter:
             no_palindrome_nums.append(n)
 
     # 2 & 3. Create and save the final plot
-    plt.figure(figsize=(8, 6))
-    plt.plot(x_vals, y_vals, "bo-", markersize=4)
-    plt.xlabel("Number (n)")
-    plt.ylabel("Iterations to Palindrome")
-    plt.title(f"Lychrel Graph: n from {start} to {end} (up to {max_iter} iterations)")
-    plt.grid(True)
-
-    # Save the figure to a file (no interactive display)
-    plt.savefig(filename)
-    plt.close()  # Close the figure so it doesn't remain open
-
-    # 4. Print iteration counts for each number
-    print(f"Iteration counts for numbers from {start} to {end} (max_iter={max_iter}):\n")
-    for n_val, iteration_val in zip(x_vals, y_vals):
-        if iteration_val == max_iter:
-            print(f"Number {n_val}: did NOT reach a palindrome within {max_iter} iterations.")
-        else:
-            print(f"Number {n_val}: reached a palindrome after {iteration_val} iterations.")
+    fig = None
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(8, 6))
+    ax.plot(x_vals, y_vals, "bo-", markersize=4)
+    ax.set_xlabel("Number (n)")
+    ax.set_ylabel("Iterations to Palindrome")
+    ax.set_title(f"Lychrel Graph: n from {start} to {end} (up to {max_iter} iterations)")
+    ax.grid(True)
+
+    if fig is not None:
+        # Save the figure to a file (no interactive display)
+        fig.savefig(filename)
+        plt.close(fig)  # Close the figure so it doesn't remain open
+
+    # 4. Print iteration counts for each number, as a single write
+    if verbose:
+        lines = [f"Iteration counts for numbers from {start} to {end} (max_iter={max_iter}):\n"]
+        for n_val, iteration_val in zip(x_vals, y_vals):
+            if iteration_val == max_iter:
+                lines.append(f"Number {n_val}: did NOT reach a palindrome within {max_iter} iterations.")
+            else:
+                lines.append(f"Number {n_val}: reached a palindrome after {iteration_val} iterations.")
+        sys.stdout.write("\n".join(lines) + "\n")
 
     # 5. Print the consecutive differences for numbers that did not reach a palindrome
     if len(no_palindrome_nums) > 1:
-        differences = [
-            no_palindrome_nums[i+1] - no_palindrome_nums[i]
-            for i in range(len(no_palindrome_nums) - 1)
-        ]
+        differences = np.diff(no_palindrome_nums).tolist()
         print("\nNumbers that did NOT reach a palindrome:", no_palindrome_nums)
         print("Differences between consecutive 'no-palindrome' numbers:", differences)
     elif len(no_palindrome_nums) == 1:
@@ -1,26 +1,40 @@
+import math
+
 import matplotlib.pyplot as plt
+from matplotlib.collections import EllipseCollection
 
 def is_palindrome(n: int) -> bool:
-    return str(n) == str(n)[::-1]
-
-def reverse_num(n: int) -> int:
-    return int(str(n)[::-1])
+    s = str(n)
+    return s == s[::-1]
 
-def lychrel_chain(n: int, max_iter: int = 200):
+def lychrel_chain(n: int, max_iter: int = 200, level_of=None, pal_dist=None):
     """
     Generate the chain of 'reverse-and-add' starting from n.
+
+    If 'level_of' is given, the chain stops early at the first value that is
+    already in the graph at a level no deeper than its position here: the rest
+    of its trajectory has been explored at least as far as this chain would go.
+    'pal_dist' then supplies that value's distance to a palindrome, if known.
+
     Returns:
         - chain: the list of numbers encountered (including n).
         - found_pal: bool indicating if a palindrome was found before max_iter.
     """
     chain = [n]
     current = n
-    for _ in range(max_iter):
-        r = reverse_num(current)
-        next_val = current + r
+    digits = str(n)
+    for i in range(1, max_iter + 1):
+        # One str() per step: the new value's digits are both its palindrome
+        # test and the next step's reversal
+        next_val = current + int(digits[::-1])
         chain.append(next_val)
-        if is_palindrome(next_val):
+        digits = str(next_val)
+        if digits == digits[::-1]:
             return chain, True
+        if level_of is not None and level_of.get(next_val, i + 1) <= i:
+            # Merged into an explored trajectory: splice here and stop
+            dist = pal_dist.get(next_val) if pal_dist is not None else None
+            return chain, dist is not None and i + dist <= max_iter
         current = next_val
     # If no palindrome is found within max_iter steps, treat as a Lychrel candidate
     return chain, False
@@ -30,59 +44,58 @@ def build_lychrel_graph(start: int, end: int, max_iter: int = 200):
     Builds adjacency relationships (edges) for the reverse-and-add graph
     for numbers in [start, end]. Also identifies any "Lychrel seeds."
 
+    Seeds whose chains merge into an already-built part of the graph stop at
+    the merge point, so shared tails are only computed once.
+
     Returns:
-        - adjacency: dict { node: set_of_next_nodes }
+        - next_of: dict { node: next_node } (reverse-and-add gives every node
+                   exactly one successor, so no per-node set is needed)
         - level_of: dict { node: (minimum) level in the chain layering }
         - lychrel_seeds: set of numbers that did not produce a palindrome
                          within max_iter steps.
     """
-    adjacency = {}
+    next_of = {}
     level_of = {}
     lychrel_seeds = set()
-
-    def add_edge(u, v):
-        """Utility to add an edge u -> v to adjacency."""
-        if u not in adjacency:
-            adjacency[u] = set()
-        adjacency[u].add(v)
+    # node -> number of steps from node to the palindrome its chain ends at
+    pal_dist = {}
 
     for n in range(start, end + 1):
-        chain, found_pal = lychrel_chain(n, max_iter)
+        chain, found_pal = lychrel_chain(n, max_iter, level_of, pal_dist)
 
         # If no palindrome found, mark n as a Lychrel candidate
         if not found_pal:
             lychrel_seeds.add(n)
 
-        # Add edges for each step in the chain
+        # Propagate the distance to the palindrome back along the new chain
+        last = chain[-1]
+        tail_dist = 0 if len(chain) > 1 and is_palindrome(last) else pal_dist.get(last)
+        if tail_dist is not None:
+            for i, node in enumerate(chain[:-1]):
+                pal_dist[node] = tail_dist + len(chain) - 1 - i
+
+        # Edges chain[i] -> chain[i+1], inserted in one pass
+        next_of.update(zip(chain, chain[1:]))
+
+        # Set each node's level once (or keep the min level if conflict)
         for i, node in enumerate(chain):
-            # Set level if not already set (or keep min level if conflict)
-            if node not in level_of:
+            prev = level_of.get(node)
+            if prev is None or i < prev:
                 level_of[node] = i
-            else:
-                level_of[node] = min(level_of[node], i)
-
-            # Edge: chain[i] -> chain[i+1], if not at the end
-            if i < len(chain) - 1:
-                nxt = chain[i + 1]
-                add_edge(node, nxt)
-                # Update level for the next node
-                if nxt not in level_of:
-                    level_of[nxt] = i + 1
-                else:
-                    level_of[nxt] = min(level_of[nxt], i + 1)
-
-    return adjacency, level_of, lychrel_seeds
-
-def plot_lychrel_graph(adjacency, level_of, lychrel_seeds, filename='lychrel_tree.png'):
+
+    return next_of, level_of, lychrel_seeds
+
+def draw_lychrel_graph(ax, next_of, level_of, lychrel_seeds):
     """
-    Plot the Lychrel graph in layers, auto-scaling the axes to fit all nodes,
-    and then save the figure to a file.
+    Draw the Lychrel graph in layers onto an existing Axes, auto-scaling it to
+    fit all nodes. Saving is left to the caller, so several graphs can share
+    one figure (e.g. a grid of subplots in a parameter sweep).
 
     Parameters:
-        adjacency: Dictionary { node -> set(next_nodes) }
+        ax: Matplotlib Axes to draw on
+        next_of: Dictionary { node -> next_node }
         level_of: Dictionary { node -> layer_index }
         lychrel_seeds: Set of nodes that did not produce a palindrome within max_iter
-        filename: Name of the file to save the figure (e.g., 'lychrel_tree.png')
     """
     from collections import defaultdict
     nodes_by_level = defaultdict(list)
@@ -93,6 +106,7 @@ def plot_lychrel_graph(adjacency, level_of, lychrel_seeds, filename='lychrel_tre
 
     # Assign (x, y) positions to each node
     pos = {}
+    node_radius = 0.2
 
     # Track min/max x,y to set plot bounds
     min_x = float('inf')
@@ -112,51 +126,72 @@ def plot_lychrel_graph(adjacency, level_of, lychrel_seeds, filename='lychrel_tre
             pos[node] = (x, y)
 
             # Track bounding box
-            node_radius = 0.2
             min_x = min(min_x, x - node_radius)
             max_x = max(max_x, x + node_radius)
             min_y = min(min_y, y - node_radius)
             max_y = max(max_y, y + node_radius)
 
-    plt.figure(figsize=(12, 10))
-    ax = plt.gca()
     ax.set_aspect('equal', adjustable='datalim')
 
-    # Draw edges
-    for u, next_nodes in adjacency.items():
+    # Draw all edges as arrows in one quiver call, trimmed to run from circle
+    # edge to circle edge so the heads are not hidden under the target node
+    x_tail, y_tail, dx, dy = [], [], [], []
+    for u, v in next_of.items():
         (x_u, y_u) = pos[u]
-        for v in next_nodes:
-            (x_v, y_v) = pos[v]
-            ax.annotate(
-                "",
-                xy=(x_v, y_v),
-                xytext=(x_u, y_u),
-                arrowprops=dict(
-                    arrowstyle="->",
-                    color="gray",
-                    shrinkA=5,
-                    shrinkB=5,
-                    lw=0.5
-                )
-            )
-
-    # Draw nodes
+        (x_v, y_v) = pos[v]
+        length = math.hypot(x_v - x_u, y_v - y_u)
+        if length == 0:
+            continue  # 0 -> 0 is its own successor; there is nothing to draw
+        trim = node_radius / length
+        x_tail.append(x_u + (x_v - x_u) * trim)
+        y_tail.append(y_u + (y_v - y_u) * trim)
+        dx.append((x_v - x_u) * (1 - 2 * trim))
+        dy.append((y_v - y_u) * (1 - 2 * trim))
+    ax.quiver(x_tail, y_tail, dx, dy, angles='xy', scale_units='xy', scale=1,
+              color="gray", width=0.001, headwidth=5, headlength=6, zorder=1)
+
+    # Draw nodes as one collection of circles sized in data units
+    colors = ["red" if node in lychrel_seeds else "skyblue" for node in pos]
+    ax.add_collection(EllipseCollection(
+        widths=2 * node_radius, heights=2 * node_radius, angles=0, units="xy",
+        offsets=list(pos.values()), offset_transform=ax.transData,
+        facecolors=colors, edgecolors="black", zorder=2
+    ))
     for node, (x, y) in pos.items():
-        color = "red" if node in lychrel_seeds else "skyblue"
-        circ = plt.Circle((x, y), 0.2, color=color, ec="black", zorder=2)
-        ax.add_patch(circ)
         ax.text(x, y, str(node), ha='center', va='center', fontsize=6, zorder=3)
 
     # Set axis limits to ensure every node is fully visible
     margin = 0.5
-    plt.xlim(min_x - margin, max_x + margin)
-    plt.ylim(min_y - margin, max_y + margin)
+    ax.set_xlim(min_x - margin, max_x + margin)
+    ax.set_ylim(min_y - margin, max_y + margin)
+
+    ax.set_title("Lychrel Tree (Reverse-and-Add) [Auto-Scaled]", fontsize=14)
+    ax.axis('off')
+
+def plot_lychrel_graph(next_of, level_of, lychrel_seeds, filename='lychrel_tree.png'):
+    """
+    Plot the Lychrel graph in layers, auto-scaling the axes to fit all nodes,
+    and then save the figure to a file.
+
+    Parameters:
+        next_of: Dictionary { node -> next_node }
+        level_of: Dictionary { node -> layer_index }
+        lychrel_seeds: Set of nodes that did not produce a palindrome within max_iter
+        filename: Name of the file to save the figure (e.g., 'lychrel_tree.png')
+    """
+    fig, ax = plt.subplots(figsize=(12, 10))
+    draw_lychrel_graph(ax, next_of, level_of, lychrel_seeds)
+
+    # The axes limits already hug the nodes, so let the axes fill the figure
+    # instead of paying for the extra render pass of bbox_inches='tight'
+    fig.subplots_adjust(left=0, right=1, bottom=0, top=0.95)
 
-    plt.title("Lychrel Tree (Reverse-and-Add) [Auto-Scaled]", fontsize=14)
-    plt.axis('off')
+    # Scale resolution down for large graphs: 300 dpi up to ~18k nodes,
+    # never below 72 dpi
+    dpi = max(72, min(300, 40000 / math.sqrt(max(1, len(level_of)))))
 
     # Save the figure before showing
-    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    fig.savefig(filename, dpi=dpi)
     print(f"Saved Lychrel tree to: {filename}")
 
     # Now show the plot
@@ -167,10 +202,10 @@ def main():
     END = 200
     MAX_ITER = 50
 
-    adjacency, level_of, lychrel_seeds = build_lychrel_graph(START, END, MAX_ITER)
+    next_of, level_of, lychrel_seeds = build_lychrel_graph(START, END, MAX_ITER)
 
     # You can change 'lychrel_tree.png' to any desired path or filename
-    plot_lychrel_graph(adjacency, level_of, lychrel_seeds, filename='lychrel_tree.png')
+    plot_lychrel_graph(next_of, level_of, lychrel_seeds, filename='lychrel_tree.png')
 
 if __name__ == "__main__":
     main()